@@ -1,33 +1,63 @@
-from flask import Flask
+from flask import Flask, flash, redirect, url_for
+from werkzeug.exceptions import RequestEntityTooLarge
 
-def create_app():
+from app.extensions import db, login_manager, csrf
+from app.models import User, Note  # noqa: F401  (registers models with db)
+from app.notes.services import NoteService
+from app.profiling import bp as profiling_bp
+from app.routes import bp as main_bp
+from app.auth import bp as auth_bp
+from app.notes import bp as notes_bp
+from app.users import bp as users_bp
+
+
+def create_app(test_config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///notes.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Reject oversized POST bodies in Werkzeug while the request is read,
+    # before any Python string or JSON construction. The limit applies to
+    # the raw urlencoded body, where non-ASCII/reserved characters inflate
+    # up to 3x, so allow that before cutting off; the byte check in
+    # NoteService remains the authoritative 2 MB limit.
+    app.config['MAX_CONTENT_LENGTH'] = 3 * NoteService.MAX_CONTENT_SIZE + 4096
+    # Reuse compiled statement objects across the fixed set of NoteService
+    # queries, and let the begin-event listener in app.extensions drive
+    # transactions instead of the driver's implicit per-statement BEGIN.
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        "execution_options": {"compiled_cache": {}},
+        "connect_args": {"check_same_thread": False, "isolation_level": None},
+    }
+
+    # Raise Jinja's compiled-template cache (default 50) well above the
+    # template count so read-heavy pages never recompile after eviction.
+    app.jinja_options = dict(app.jinja_options, cache_size=1000)
+
+    # Apply overrides (e.g. the test config) before the extensions and
+    # create_all below see the database URI, so tests never touch notes.db.
+    if test_config:
+        app.config.update(test_config)
 
     # Initialize extensions
-    from app.extensions import db, login_manager, csrf
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
 
-    # Register blueprints
-    from app.routes import bp
-    app.register_blueprint(bp)
-
-    from app.auth import bp as auth_bp
+    # Register blueprints (constructed once at import time)
+    app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
-
-    from app.notes import bp as notes_bp
     app.register_blueprint(notes_bp)
-
-    from app.users import bp as users_bp
     app.register_blueprint(users_bp)
+    app.register_blueprint(profiling_bp)
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_request_too_large(error):
+        flash('Content exceeds maximum size of 2 MB', 'danger')
+        return redirect(url_for('notes.new_note'))
 
     # Create database tables if they don't exist
     with app.app_context():
-        from app.models import User, Note  # noqa: F401
         db.create_all()
 
     return app
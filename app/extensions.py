@@ -1,6 +1,10 @@
+import sqlite3
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 login_manager = LoginManager()
@@ -8,6 +12,40 @@ login_manager.login_view = "auth.login"
 csrf = CSRFProtect()
 
 
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """Apply SQLite tuning pragmas on every new connection.
+
+    WAL mode lets reads proceed concurrently with a writer and turns each
+    commit into a WAL append instead of a rollback-journal rewrite;
+    busy_timeout avoids spurious "database is locked" errors under
+    concurrent workers. No-op for non-SQLite backends.
+    """
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@event.listens_for(Engine, "begin")
+def _begin_sqlite(conn):
+    """Open SQLite transactions explicitly.
+
+    The engine connects with isolation_level=None so the sqlite3 driver
+    stops emitting an implicit BEGIN before every statement; this listener
+    restores transactional behavior by issuing BEGIN exactly once per
+    SQLAlchemy transaction.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN")
+
+
 @login_manager.user_loader
 def load_user(user_id):
     from app.models import User
@@ -1,19 +1,35 @@
-from datetime import datetime
 from app.extensions import db
 
 
 class Note(db.Model):
     __tablename__ = "notes"
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
     title = db.Column(db.String(200), nullable=True)
-    content_delta = db.Column(db.Text, nullable=False)
+    # Deferred so metadata-only operations (delete/share/unshare, list pages)
+    # never pull multi-megabyte content off disk.
+    content_delta = db.deferred(db.Column(db.Text, nullable=False))
+    content_plain = db.deferred(db.Column(db.Text, nullable=False, default=''))
 
     is_shared = db.Column(db.Boolean, default=False, nullable=False)
-    share_token = db.Column(db.String(64), unique=True, nullable=True, index=True)
+    share_token = db.Column(db.String(64), nullable=True)
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # DB-side timestamps: SQLite resolves CURRENT_TIMESTAMP itself instead of
+    # calling back into Python on every INSERT/UPDATE.
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(),
+                           nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(),
+                           onupdate=db.func.current_timestamp(), nullable=False)
 
     user = db.relationship("User", back_populates="notes")
+
+    # Matches the list-page query (WHERE user_id = ? ORDER BY updated_at DESC)
+    # so SQLite returns rows pre-sorted straight from the index.
+    __table_args__ = (
+        db.Index("ix_notes_user_updated", "user_id", db.text("updated_at DESC")),
+        # Public-link lookups only ever match shared rows, so index just
+        # those; unshared notes keep their token without occupying pages.
+        db.Index("ix_notes_share_token_shared", "share_token", unique=True,
+                 sqlite_where=db.text("is_shared = 1")),
+    )
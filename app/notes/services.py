@@ -1,17 +1,72 @@
-import json
 import secrets
+from types import SimpleNamespace
+
+import orjson
+import sqlalchemy as sa
 from typing import Optional
 from app.models import Note
 from app.extensions import db
 
 
+def _within_size(s: str, limit: int) -> bool:
+    """Check UTF-8 byte length against a limit without encoding when possible.
+
+    UTF-8 needs at most 4 bytes per code point, so strings short enough in
+    code points are accepted (and strings longer than the limit rejected)
+    without allocating a multi-megabyte encoded copy.
+    """
+    n = len(s)
+    if n * 4 <= limit:
+        return True
+    if n > limit:
+        return False
+    return len(s.encode('utf-8')) <= limit
+
+
+def _plain_text_from_delta(delta) -> str:
+    """Extract plain text from a parsed Quill Delta document."""
+    try:
+        return ''.join(op.get('insert', '') for op in delta.get('ops', ()))
+    except (AttributeError, TypeError):
+        return ''
+
+
 class NoteService:
     """Service layer for Note CRUD operations"""
 
     MAX_CONTENT_SIZE = 2 * 1024 * 1024  # 2 MB
 
     @staticmethod
-    def create_note(user_id: int, title: str, content_delta: str) -> Note:
+    def _create_in_session(user_id: int, title: str, content_delta: str,
+                           skip_validation: bool = False,
+                           content_plain: Optional[str] = None) -> Note:
+        """Validates and stages a new note without committing."""
+        # Validate JSON and extract plain text once at write time
+        if not skip_validation or content_plain is None:
+            try:
+                delta = orjson.loads(content_delta)
+            except orjson.JSONDecodeError:
+                raise ValueError("Invalid JSON content")
+            if content_plain is None:
+                content_plain = _plain_text_from_delta(delta)
+
+        # Check size
+        if not _within_size(content_delta, NoteService.MAX_CONTENT_SIZE):
+            raise ValueError("Content exceeds maximum size of 2 MB")
+
+        note = Note(
+            user_id=user_id,
+            title=title,
+            content_delta=content_delta,
+            content_plain=content_plain
+        )
+        db.session.add(note)
+        return note
+
+    @staticmethod
+    def create_note(user_id: int, title: str, content_delta: str,
+                    skip_validation: bool = False,
+                    content_plain: Optional[str] = None) -> Note:
         """
         Creates a new note with validation.
 
@@ -19,6 +74,10 @@ class NoteService:
             user_id: ID of the note owner
             title: Note title
             content_delta: Quill Delta JSON string
+            skip_validation: Skip the JSON re-parse for callers that just
+                serialized the Delta themselves
+            content_plain: Pre-extracted plain text; derived from the Delta
+                when not provided
 
         Returns:
             Note instance
@@ -26,53 +85,82 @@ class NoteService:
         Raises:
             ValueError: If content is invalid or too large
         """
-        # Validate JSON
-        try:
-            json.loads(content_delta)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON content")
+        note = NoteService._create_in_session(
+            user_id, title, content_delta,
+            skip_validation=skip_validation, content_plain=content_plain)
+        db.session.commit()
+        return note
 
-        # Check size
-        if len(content_delta.encode('utf-8')) > NoteService.MAX_CONTENT_SIZE:
-            raise ValueError("Content exceeds maximum size of 2 MB")
+    @staticmethod
+    def bulk_create(user_id: int, items) -> list[Note]:
+        """
+        Creates many notes in one transaction, i.e. a single commit/fsync.
 
-        note = Note(
-            user_id=user_id,
-            title=title,
-            content_delta=content_delta
-        )
-        db.session.add(note)
+        Args:
+            user_id: ID of the note owner
+            items: Iterable of (title, content_delta) pairs
+
+        Returns:
+            List of Note instances
+
+        Raises:
+            ValueError: If any content is invalid or too large (nothing
+                is committed)
+        """
+        notes = [
+            NoteService._create_in_session(user_id, title, content_delta)
+            for title, content_delta in items
+        ]
         db.session.commit()
-        return note
+        return notes
 
     @staticmethod
-    def get_note_by_id(note_id: int) -> Optional[Note]:
+    def get_note_by_id(note_id: int, load_content: bool = True) -> Optional[Note]:
         """
         Retrieves a single note by ID.
 
         Args:
             note_id: Note ID
+            load_content: Load the deferred content columns up front; pass
+                False for metadata-only operations
 
         Returns:
             Note instance or None if not found
         """
+        if load_content:
+            return db.session.get(
+                Note, note_id,
+                options=[sa.orm.undefer(Note.content_delta),
+                         sa.orm.undefer(Note.content_plain)])
         return db.session.get(Note, note_id)
 
     @staticmethod
-    def get_all_notes(user_id: int) -> list[Note]:
+    def get_all_notes(user_id: int):
         """
-        Retrieves all notes for a user, ordered by update time descending.
+        Retrieves the list-page columns of a user's notes, ordered by update
+        time descending.
+
+        Only the columns the list page renders are selected, so note bodies
+        are never loaded, and rows are streamed in batches instead of
+        materialized into one list.
 
         Args:
             user_id: User ID
 
         Returns:
-            List of Note instances
+            Iterator of (id, title, updated_at, is_shared) rows
         """
-        return Note.query.filter_by(user_id=user_id).order_by(Note.updated_at.desc()).all()
+        stmt = (
+            sa.select(Note.id, Note.title, Note.updated_at, Note.is_shared)
+            .where(Note.user_id == user_id)
+            .order_by(Note.updated_at.desc())
+        )
+        return db.session.execute(stmt).yield_per(100)
 
     @staticmethod
-    def update_note(note_id: int, title: str, content_delta: str) -> Note:
+    def update_note(note_id: int, title: str, content_delta: str,
+                    skip_validation: bool = False,
+                    content_plain: Optional[str] = None) -> SimpleNamespace:
         """
         Updates an existing note.
 
@@ -80,31 +168,58 @@ class NoteService:
             note_id: Note ID
             title: New title
             content_delta: New content (Quill Delta JSON)
+            skip_validation: Skip the JSON re-parse for callers that just
+                serialized the Delta themselves
+            content_plain: Pre-extracted plain text; derived from the Delta
+                when not provided
 
         Returns:
-            Updated Note instance
+            Lightweight (id, title) namespace for the updated note
 
         Raises:
             ValueError: If note not found or content invalid
         """
-        note = NoteService.get_note_by_id(note_id)
-        if not note:
-            raise ValueError("Note not found")
+        note = NoteService._update_in_session(
+            note_id, title, content_delta,
+            skip_validation=skip_validation, content_plain=content_plain)
+        db.session.commit()
+        return note
 
-        # Validate JSON
-        try:
-            json.loads(content_delta)
-        except json.JSONDecodeError:
-            raise ValueError("Invalid JSON content")
+    @staticmethod
+    def _update_in_session(note_id: int, title: str, content_delta: str,
+                           skip_validation: bool = False,
+                           content_plain: Optional[str] = None) -> SimpleNamespace:
+        """Validates and executes a note update without committing.
+
+        Issues a single UPDATE ... RETURNING, so the existing row (up to
+        2 MB of content) is never read back just to overwrite it.
+        """
+        # Validate JSON and extract plain text once at write time
+        if not skip_validation or content_plain is None:
+            try:
+                delta = orjson.loads(content_delta)
+            except orjson.JSONDecodeError:
+                raise ValueError("Invalid JSON content")
+            if content_plain is None:
+                content_plain = _plain_text_from_delta(delta)
 
         # Check size
-        if len(content_delta.encode('utf-8')) > NoteService.MAX_CONTENT_SIZE:
+        if not _within_size(content_delta, NoteService.MAX_CONTENT_SIZE):
             raise ValueError("Content exceeds maximum size of 2 MB")
 
-        note.title = title
-        note.content_delta = content_delta
-        db.session.commit()
-        return note
+        stmt = (
+            sa.update(Note)
+            .where(Note.id == note_id)
+            .values(title=title,
+                    content_delta=content_delta,
+                    content_plain=content_plain)
+            .returning(Note.id, Note.title)
+        )
+        row = db.session.execute(stmt).first()
+        if row is None:
+            raise ValueError("Note not found")
+
+        return SimpleNamespace(id=row.id, title=row.title)
 
     @staticmethod
     def delete_note(note_id: int) -> bool:
@@ -120,13 +235,39 @@ class NoteService:
         Raises:
             ValueError: If note not found
         """
-        note = NoteService.get_note_by_id(note_id)
+        NoteService._delete_in_session(note_id)
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def _delete_in_session(note_id: int) -> None:
+        """Stages a note deletion without committing."""
+        note = NoteService.get_note_by_id(note_id, load_content=False)
         if not note:
             raise ValueError("Note not found")
 
         db.session.delete(note)
+
+    @staticmethod
+    def bulk_delete(note_ids) -> int:
+        """
+        Deletes many notes in one transaction, i.e. a single commit/fsync.
+
+        Args:
+            note_ids: Iterable of note IDs
+
+        Returns:
+            Number of notes deleted
+
+        Raises:
+            ValueError: If any note is not found (nothing is committed)
+        """
+        count = 0
+        for note_id in note_ids:
+            NoteService._delete_in_session(note_id)
+            count += 1
         db.session.commit()
-        return True
+        return count
 
     @staticmethod
     def share_note(note_id: int) -> str:
@@ -142,20 +283,25 @@ class NoteService:
         Raises:
             ValueError: If note not found
         """
-        note = NoteService.get_note_by_id(note_id)
-        if not note:
+        token = secrets.token_urlsafe(32)
+        stmt = (
+            sa.update(Note)
+            .where(Note.id == note_id)
+            .values(is_shared=True,
+                    share_token=sa.func.coalesce(Note.share_token, token))
+            .returning(Note.share_token)
+        )
+        row = db.session.execute(stmt).first()
+        if row is None:
             raise ValueError("Note not found")
 
-        note.is_shared = True
-        if not note.share_token:
-            note.share_token = secrets.token_urlsafe(32)
         db.session.commit()
-        return note.share_token
+        return row.share_token
 
     @staticmethod
     def unshare_note(note_id: int) -> bool:
         """
-        Disables sharing and clears token.
+        Disables sharing; the token is kept so re-sharing restores the link.
 
         Args:
             note_id: Note ID
@@ -166,11 +312,16 @@ class NoteService:
         Raises:
             ValueError: If note not found
         """
-        note = NoteService.get_note_by_id(note_id)
-        if not note:
+        stmt = (
+            sa.update(Note)
+            .where(Note.id == note_id)
+            .values(is_shared=False)
+            .returning(Note.id)
+        )
+        row = db.session.execute(stmt).first()
+        if row is None:
             raise ValueError("Note not found")
 
-        note.is_shared = False
         db.session.commit()
         return True
 
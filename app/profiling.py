@@ -0,0 +1,71 @@
+"""Lightweight per-route latency instrumentation.
+
+Enable with ``app.config['PROFILING_ENABLED'] = True``; while disabled the
+decorator costs one config lookup per request and records nothing. Samples
+are kept in fixed-size ring buffers, so memory stays bounded under load.
+"""
+import functools
+import time
+from collections import deque
+from threading import Lock
+
+from flask import Blueprint, abort, current_app, jsonify
+from flask_login import login_required
+
+bp = Blueprint('profiling', __name__)
+
+_RING_SIZE = 1024
+
+_samples: dict[str, deque] = {}
+_lock = Lock()
+
+
+def _emit(name, elapsed_ns):
+    with _lock:
+        ring = _samples.get(name)
+        if ring is None:
+            ring = _samples[name] = deque(maxlen=_RING_SIZE)
+        ring.append(elapsed_ns)
+
+
+def profile_route(name):
+    """Record wall-clock latency of the decorated view under `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('PROFILING_ENABLED'):
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _emit(name, time.perf_counter_ns() - t0)
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_values, pct):
+    idx = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[idx]
+
+
+@bp.route('/profiling')
+@login_required
+def profiling_stats():
+    """Dump per-route latency percentiles (ms) from the ring buffers."""
+    if not current_app.config.get('PROFILING_ENABLED'):
+        abort(404)
+
+    with _lock:
+        snapshot = {name: sorted(ring) for name, ring in _samples.items()}
+
+    stats = {
+        name: {
+            'count': len(values),
+            'p50_ms': _percentile(values, 50) / 1e6,
+            'p90_ms': _percentile(values, 90) / 1e6,
+            'p99_ms': _percentile(values, 99) / 1e6,
+        }
+        for name, values in snapshot.items() if values
+    }
+    return jsonify(stats)
@@ -1,5 +1,6 @@
+import sqlalchemy as sa
 from typing import Optional
-from app.models import User
+from app.models import Note, User
 from app.extensions import db
 
 
@@ -135,12 +136,36 @@ class UserService:
         db.session.commit()
         return True
 
+    @staticmethod
+    def get_note_count(user_id: int) -> int:
+        """
+        Counts a user's notes without loading them.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Number of notes owned by the user
+        """
+        return db.session.scalar(
+            sa.select(sa.func.count()).select_from(Note).where(Note.user_id == user_id)
+        )
+
     @staticmethod
     def get_all_users() -> list[User]:
         """
         Retrieves all users (admin function).
 
+        The notes relationship is eager-loaded (IDs only) so per-user note
+        counts render without one extra query per row; templates should not
+        touch other lazy attributes on the returned notes.
+
         Returns:
             List of User instances
         """
-        return User.query.order_by(User.created_at.desc()).all()
+        return (
+            User.query
+            .options(sa.orm.selectinload(User.notes).load_only(Note.id))
+            .order_by(User.created_at.desc())
+            .all()
+        )
@@ -19,7 +19,7 @@ def view_user(id):
     if not user:
         abort(404)
 
-    note_count = len(user.notes)
+    note_count = UserService.get_note_count(id)
     return render_template('users/view.html', user=user, note_count=note_count)
 
 
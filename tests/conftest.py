@@ -1,19 +1,56 @@
+from functools import lru_cache
+
 import pytest
-from app import create_app
-from app.extensions import db as _db
-from app.models import User, Note
+
+_TEST_CONFIG = frozenset({
+    ('TESTING', True),
+    ('SQLALCHEMY_DATABASE_URI', 'sqlite://'),
+    ('WTF_CSRF_ENABLED', False),
+    ('SERVER_NAME', 'localhost'),
+})
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing():
+    """Drop the password hash work factor for the whole test session.
+
+    Werkzeug's default (scrypt) is deliberately slow; the user fixtures
+    only need hashes that round-trip through check_password, so a
+    single-iteration PBKDF2 is plenty. check_password_hash reads the
+    method from the stored hash, so verification is unaffected.
+    """
+    import app.models.user as user_model
+
+    mp = pytest.MonkeyPatch()
+    real = user_model.generate_password_hash
+    mp.setattr(user_model, 'generate_password_hash',
+               lambda password: real(password, method='pbkdf2:sha256:1'))
+    yield
+    mp.undo()
+
+
+@lru_cache(maxsize=8)
+def _cached_app(config_key):
+    """Build one Flask app per distinct config.
+
+    create_app() dominates fixture cost; per-test isolation comes from
+    the create_all/drop_all cycle in the app fixture, not a fresh app.
+    The import is deferred so collection-only and filtered runs never
+    pay for Flask/SQLAlchemy startup. The config is passed into
+    create_app() so the in-memory URI is active before the factory's
+    create_all — tests (and parallel xdist workers) never open notes.db.
+    """
+    from app import create_app
+
+    return create_app(dict(config_key))
 
 
 @pytest.fixture
 def app():
-    """Create a test Flask application with in-memory SQLite."""
-    app = create_app()
-    app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
-        'WTF_CSRF_ENABLED': False,
-        'SERVER_NAME': 'localhost',
-    })
+    """Provide the shared test Flask application with a fresh in-memory DB."""
+    from app.extensions import db as _db
+
+    app = _cached_app(_TEST_CONFIG)
 
     with app.app_context():
         _db.create_all()
@@ -25,6 +62,8 @@ def app():
 @pytest.fixture
 def db(app):
     """Provide the database session."""
+    from app.extensions import db as _db
+
     return _db
 
 
@@ -37,6 +76,8 @@ def client(app):
 @pytest.fixture
 def user(app, db):
     """Create a test user and return it."""
+    from app.models import User
+
     u = User(email='test@example.com')
     u.set_password('password123')
     db.session.add(u)
@@ -47,6 +88,8 @@ def user(app, db):
 @pytest.fixture
 def other_user(app, db):
     """Create a second test user."""
+    from app.models import User
+
     u = User(email='other@example.com')
     u.set_password('password123')
     db.session.add(u)
@@ -57,6 +100,8 @@ def other_user(app, db):
 @pytest.fixture
 def note(app, db, user):
     """Create a test note owned by `user`."""
+    from app.models import Note
+
     n = Note(
         user_id=user.id,
         title='Test Note',
@@ -117,6 +117,24 @@ class TestNoteCRUDRoutes:
         }, follow_redirects=True)
         assert b'Content is required' in resp.data
 
+    def test_create_note_oversized_content_rejected_by_service(self, auth_client):
+        # Over the 2 MB content limit but under the Werkzeug body cap, so
+        # the service-layer byte check does the rejecting.
+        resp = auth_client.post('/notes', data={
+            'title': 'Huge',
+            'content': 'x' * (3 * 1024 * 1024),
+        }, follow_redirects=True)
+        assert b'Content exceeds maximum size' in resp.data
+
+    def test_create_note_oversized_body_rejected_by_werkzeug(self, auth_client):
+        # Over MAX_CONTENT_LENGTH (3x the content limit + slack), so the
+        # request is refused while being read and the 413 handler redirects.
+        resp = auth_client.post('/notes', data={
+            'title': 'Huge',
+            'content': 'x' * (7 * 1024 * 1024),
+        }, follow_redirects=True)
+        assert b'Content exceeds maximum size' in resp.data
+
     def test_edit_note_form(self, auth_client, note):
         resp = auth_client.get(f'/notes/{note.id}/edit')
         assert resp.status_code == 200
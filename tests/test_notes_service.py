@@ -41,6 +41,22 @@ class TestNoteService:
             assert result.title == title
             assert result.content_delta == content
 
+    def test_create_note_populates_content_plain(self, app_context):
+        """Test plain text is extracted and stored at write time"""
+        with patch('app.notes.services.db.session'):
+            result = NoteService.create_note(1, "Title", '{"ops":[{"insert":"Hello\\n"}]}')
+
+            assert result.content_plain == "Hello\n"
+
+    def test_create_note_skip_validation_uses_provided_plain(self, app_context):
+        """Test trusted callers can skip the re-parse and supply plain text"""
+        with patch('app.notes.services.db.session'):
+            result = NoteService.create_note(
+                1, "Title", '{"ops":[{"insert":"Hi\\n"}]}',
+                skip_validation=True, content_plain="Hi\n")
+
+            assert result.content_plain == "Hi\n"
+
     def test_create_note_invalid_json(self, app_context):
         """Test validation for invalid JSON content"""
         with patch('app.notes.services.db.session'):
@@ -71,7 +87,20 @@ class TestNoteService:
             # Execute
             result = NoteService.get_note_by_id(1)
 
-            # Verify
+            # Verify content columns are undeferred on the default path
+            assert result == mock_note
+            args, kwargs = mock_session.get.call_args
+            assert args == (Note, 1)
+            assert kwargs.get('options')
+
+    def test_get_note_by_id_metadata_only(self, app_context):
+        """Test load_content=False skips the deferred content columns"""
+        with patch('app.notes.services.db.session') as mock_session:
+            mock_note = MagicMock(spec=Note)
+            mock_session.get.return_value = mock_note
+
+            result = NoteService.get_note_by_id(1, load_content=False)
+
             assert result == mock_note
             mock_session.get.assert_called_once_with(Note, 1)
 
@@ -85,48 +114,56 @@ class TestNoteService:
             assert result is None
 
     def test_get_all_notes(self, app_context):
-        """Test retrieving all notes for a user"""
-        with patch('app.models.Note.query') as mock_query:
+        """Test retrieving list-page rows for a user"""
+        with patch('app.notes.services.db.session') as mock_session:
             # Setup mocks
-            mock_note1 = MagicMock(spec=Note)
-            mock_note2 = MagicMock(spec=Note)
-            mock_filter = MagicMock()
-            mock_order = MagicMock()
-
-            mock_query.filter_by.return_value = mock_filter
-            mock_filter.order_by.return_value = mock_order
-            mock_order.all.return_value = [mock_note1, mock_note2]
+            mock_row1 = MagicMock()
+            mock_row2 = MagicMock()
+            mock_session.execute.return_value.yield_per.return_value = iter(
+                [mock_row1, mock_row2])
 
             # Execute
             result = NoteService.get_all_notes(1)
 
-            # Verify
-            assert len(result) == 2
-            mock_query.filter_by.assert_called_once_with(user_id=1)
+            # Verify only list-page columns are selected, streamed lazily
+            assert len(list(result)) == 2
+            stmt = str(mock_session.execute.call_args[0][0]).lower()
+            assert "content_delta" not in stmt
+            assert "order by" in stmt
 
     def test_update_note_success(self, app_context):
-        """Test successful note update"""
+        """Test successful note update via a single UPDATE statement"""
         with patch('app.notes.services.db.session') as mock_session:
             # Setup
-            mock_note = MagicMock(spec=Note)
-            mock_note.id = 1
-            mock_session.get.return_value = mock_note
+            mock_row = MagicMock()
+            mock_row.id = 1
+            mock_row.title = "Updated Title"
+            mock_session.execute.return_value.first.return_value = mock_row
 
-            new_title = "Updated Title"
             new_content = '{"ops":[{"insert":"Updated\\n"}]}'
 
             # Execute
-            result = NoteService.update_note(1, new_title, new_content)
+            result = NoteService.update_note(1, "Updated Title", new_content)
 
             # Verify
-            assert result.title == new_title
-            assert result.content_delta == new_content
+            assert result.id == 1
+            assert result.title == "Updated Title"
             assert mock_session.commit.called
 
+    def test_update_note_populates_content_plain(self, app_context):
+        """Test plain text is re-extracted on update"""
+        with patch('app.notes.services.db.session') as mock_session:
+            mock_session.execute.return_value.first.return_value = MagicMock()
+
+            NoteService.update_note(1, "Title", '{"ops":[{"insert":"Updated\\n"}]}')
+
+            stmt = mock_session.execute.call_args[0][0]
+            assert stmt.compile().params['content_plain'] == "Updated\n"
+
     def test_update_note_not_found(self, app_context):
         """Test updating non-existent note raises error"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_session.get.return_value = None
+            mock_session.execute.return_value.first.return_value = None
 
             with pytest.raises(ValueError, match="Note not found"):
                 NoteService.update_note(999, "Title", '{"ops":[]}')
@@ -134,12 +171,11 @@ class TestNoteService:
     def test_update_note_invalid_json(self, app_context):
         """Test updating with invalid JSON raises error"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_note = MagicMock(spec=Note)
-            mock_session.get.return_value = mock_note
-
             with pytest.raises(ValueError, match="Invalid JSON content"):
                 NoteService.update_note(1, "Title", "invalid json")
 
+            assert not mock_session.execute.called
+
     def test_delete_note_success(self, app_context):
         """Test successful deletion"""
         with patch('app.notes.services.db.session') as mock_session:
@@ -160,41 +196,62 @@ class TestNoteService:
             with pytest.raises(ValueError, match="Note not found"):
                 NoteService.delete_note(999)
 
+    def test_bulk_create_commits_once(self, app_context):
+        """Test bulk_create stages every note and commits a single time"""
+        with patch('app.notes.services.db.session') as mock_session:
+            items = [
+                ("One", '{"ops":[{"insert":"a\\n"}]}'),
+                ("Two", '{"ops":[{"insert":"b\\n"}]}'),
+            ]
+
+            result = NoteService.bulk_create(1, items)
+
+            assert len(result) == 2
+            assert mock_session.add.call_count == 2
+            assert mock_session.commit.call_count == 1
+
+    def test_bulk_delete_commits_once(self, app_context):
+        """Test bulk_delete stages every deletion and commits a single time"""
+        with patch('app.notes.services.db.session') as mock_session:
+            mock_session.get.return_value = MagicMock(spec=Note)
+
+            result = NoteService.bulk_delete([1, 2, 3])
+
+            assert result == 3
+            assert mock_session.delete.call_count == 3
+            assert mock_session.commit.call_count == 1
+
     def test_share_note_generates_token(self, app_context):
-        """Test share creates unique token"""
+        """Test share issues a single UPDATE and returns the stored token"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_note = MagicMock(spec=Note)
-            mock_note.is_shared = False
-            mock_note.share_token = None
-            mock_session.get.return_value = mock_note
+            mock_row = MagicMock()
+            mock_row.share_token = "stored_token"
+            mock_session.execute.return_value.first.return_value = mock_row
 
             token = NoteService.share_note(1)
 
-            assert token is not None
-            assert len(token) > 0
-            assert mock_note.is_shared is True
-            assert mock_note.share_token == token
+            assert token == "stored_token"
+            assert mock_session.execute.called
             assert mock_session.commit.called
 
     def test_share_note_preserves_existing_token(self, app_context):
         """Test re-sharing keeps the same token instead of regenerating"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_note = MagicMock(spec=Note)
-            mock_note.is_shared = False
-            mock_note.share_token = "existing_token_abc"
-            mock_session.get.return_value = mock_note
+            mock_row = MagicMock()
+            mock_row.share_token = "existing_token_abc"
+            mock_session.execute.return_value.first.return_value = mock_row
 
             token = NoteService.share_note(1)
 
+            # The UPDATE keeps an existing token via COALESCE
             assert token == "existing_token_abc"
-            assert mock_note.is_shared is True
-            assert mock_note.share_token == "existing_token_abc"
-            assert mock_session.commit.called
+            stmt = str(mock_session.execute.call_args[0][0]).lower()
+            assert "coalesce" in stmt
 
     def test_share_note_not_found(self, app_context):
         """Test sharing non-existent note raises error"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_session.get.return_value = None
+            mock_session.execute.return_value.first.return_value = None
 
             with pytest.raises(ValueError, match="Note not found"):
                 NoteService.share_note(999)
@@ -202,22 +259,20 @@ class TestNoteService:
     def test_unshare_note_keeps_token(self, app_context):
         """Test unshare disables sharing but preserves token for re-sharing"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_note = MagicMock(spec=Note)
-            mock_note.is_shared = True
-            mock_note.share_token = "some_token"
-            mock_session.get.return_value = mock_note
+            mock_session.execute.return_value.first.return_value = MagicMock()
 
             result = NoteService.unshare_note(1)
 
             assert result is True
-            assert mock_note.is_shared is False
-            assert mock_note.share_token == "some_token"
+            # Only is_shared is cleared; share_token is left in place
+            stmt = mock_session.execute.call_args[0][0]
+            assert 'share_token' not in stmt.compile().params
             assert mock_session.commit.called
 
     def test_unshare_note_not_found(self, app_context):
         """Test unsharing non-existent note raises error"""
         with patch('app.notes.services.db.session') as mock_session:
-            mock_session.get.return_value = None
+            mock_session.execute.return_value.first.return_value = None
 
             with pytest.raises(ValueError, match="Note not found"):
                 NoteService.unshare_note(999)
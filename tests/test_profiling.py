@@ -0,0 +1,25 @@
+class TestProfiling:
+    """Tests for the opt-in route latency instrumentation."""
+
+    def test_profiling_endpoint_requires_login(self, client):
+        resp = client.get('/profiling')
+        assert resp.status_code == 302
+        assert '/auth/login' in resp.headers['Location']
+
+    def test_profiling_endpoint_404_when_disabled(self, auth_client):
+        resp = auth_client.get('/profiling')
+        assert resp.status_code == 404
+
+    def test_profiling_collects_route_latencies(self, app, auth_client, note):
+        # The app object is cached across tests, so always restore the flag.
+        app.config['PROFILING_ENABLED'] = True
+        try:
+            auth_client.get(f'/notes/{note.id}')
+            resp = auth_client.get('/profiling')
+
+            assert resp.status_code == 200
+            stats = resp.get_json()
+            assert stats['notes.view_note']['count'] >= 1
+            assert stats['notes.view_note']['p50_ms'] >= 0
+        finally:
+            app.config['PROFILING_ENABLED'] = False
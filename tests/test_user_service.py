@@ -1,214 +1,227 @@
+"""Unit tests for UserService with a fully mocked database.
+
+This module is self-contained plain-assert code, so pytest's assertion
+rewriting is disabled to cut import-time AST passes. PYTEST_DONT_REWRITE
+"""
+import re
+from types import SimpleNamespace
+
 import pytest
-from unittest.mock import MagicMock, patch
-from app import create_app
+from unittest.mock import MagicMock, call, patch
 from app.services.user_service import UserService
 from app.models import User
 
+# Pre-baked, read-only user stubs for tests that only need a fixed
+# check_password answer and never assert on the stub's call records.
+# Plain namespaces: far cheaper to build than MagicMock scaffolding.
+_user_true = SimpleNamespace(check_password=lambda p: True)
+_user_false = SimpleNamespace(check_password=lambda p: False)
+_existing_user = SimpleNamespace()
 
-@pytest.fixture
-def app():
-    """Create and configure a test Flask application"""
-    app = create_app()
-    app.config['TESTING'] = True
-    return app
+# Compiled once; pytest.raises(match=...) re-compiles string patterns on
+# every call, but re.search accepts an already-compiled pattern as-is.
+_RE_DUP_EMAIL = re.compile(r"Email already registered")
+_RE_INVALID_EMAIL = re.compile(r"Invalid email format")
+_RE_SHORT_PASSWORD = re.compile(r"Password must be at least 6 characters")
+_RE_USER_NOT_FOUND = re.compile(r"User not found")
+_RE_WRONG_OLD_PASSWORD = re.compile(r"Current password is incorrect")
+_RE_SHORT_NEW_PASSWORD = re.compile(r"New password must be at least 6 characters")
+
+
+@pytest.fixture(scope="module")
+def _db_session_patcher():
+    """Patch db.session once for the whole module, not once per test"""
+    patcher = patch('app.services.user_service.db.session',
+                    autospec=False, create=False)
+    yield patcher.start()
+    patcher.stop()
+
+
+@pytest.fixture(autouse=True)
+def mock_db_session(_db_session_patcher):
+    """Hand each test a freshly reset view of the shared session mock"""
+    _db_session_patcher.reset_mock(return_value=True, side_effect=True)
+    yield _db_session_patcher
+
+
+@pytest.fixture(scope="module")
+def _user_query_patcher():
+    """Patch User.query once per module instead of once per test"""
+    patcher = patch('app.models.User.query', autospec=False, create=False)
+    yield patcher.start()
+    patcher.stop()
 
 
 @pytest.fixture
-def app_context(app):
-    """Create an application context for tests"""
-    with app.app_context():
-        yield app
+def user_query_mock(_user_query_patcher):
+    """Per-test view of the shared query mock; tests set only the leaf
+    return value on the pre-built filter_by/options chains."""
+    _user_query_patcher.reset_mock(return_value=True, side_effect=True)
+    yield _user_query_patcher
+
+
+def test_create_user_success(mock_db_session, monkeypatch):
+    """Test successful user creation"""
+    monkeypatch.setattr(UserService, 'get_user_by_email', lambda *_: None)
+    email = "test@example.com"
+    password = "password123"
+
+    result = UserService.create_user(email, password)
+
+    assert mock_db_session.add.call_count == 1
+    assert mock_db_session.commit.call_count == 1
+    assert result.email == email
+
+
+@pytest.mark.parametrize("email,password,get_return,msg", [
+    ("existing@example.com", "password", _existing_user, _RE_DUP_EMAIL),
+    ("invalid-email", "password", None, _RE_INVALID_EMAIL),
+    ("test@example.com", "12345", None, _RE_SHORT_PASSWORD),
+])
+def test_create_user_rejects(monkeypatch, email, password, get_return, msg):
+    """Test create_user rejects duplicates, bad emails and short passwords"""
+    monkeypatch.setattr(UserService, 'get_user_by_email', lambda *_: get_return)
+    with pytest.raises(ValueError, match=msg):
+        UserService.create_user(email, password)
+
+
+def test_get_user_by_id_found(mock_db_session):
+    """Test retrieving existing user by ID"""
+    mock_user = SimpleNamespace(id=1, email="test@example.com")
+    mock_db_session.get.return_value = mock_user
+
+    result = UserService.get_user_by_id(1)
+
+    assert result == mock_user
+    assert mock_db_session.get.call_count == 1
+    assert mock_db_session.get.call_args == call(User, 1)
+
+
+def test_get_user_by_id_not_found(mock_db_session):
+    """Test retrieving non-existent user returns None"""
+    mock_db_session.get.return_value = None
+
+    result = UserService.get_user_by_id(999)
+
+    assert result is None
+
+
+def test_get_user_by_email_found(user_query_mock):
+    """Test retrieving user by email"""
+    mock_user = SimpleNamespace(email="test@example.com")
+    user_query_mock.filter_by.return_value.first.return_value = mock_user
+
+    result = UserService.get_user_by_email("test@example.com")
 
+    assert result == mock_user
+    assert user_query_mock.filter_by.call_count == 1
+    assert user_query_mock.filter_by.call_args == call(email="test@example.com")
 
-class TestUserService:
-    """Unit tests for UserService with mocked database"""
 
-    def test_create_user_success(self, app_context):
-        """Test successful user creation"""
-        with patch('app.services.user_service.db.session') as mock_session, \
-             patch('app.services.user_service.UserService.get_user_by_email', return_value=None):
+def test_get_user_by_email_not_found(user_query_mock):
+    """Test retrieving non-existent email returns None"""
+    user_query_mock.filter_by.return_value.first.return_value = None
 
-            email = "test@example.com"
-            password = "password123"
+    result = UserService.get_user_by_email("nonexistent@example.com")
 
-            result = UserService.create_user(email, password)
+    assert result is None
 
-            assert mock_session.add.called
-            assert mock_session.commit.called
-            assert result.email == email
 
-    def test_create_user_duplicate_email(self, app_context):
-        """Test creating user with existing email raises error"""
-        with patch('app.services.user_service.UserService.get_user_by_email') as mock_get:
-            mock_user = MagicMock(spec=User)
-            mock_get.return_value = mock_user
+def test_authenticate_success(monkeypatch):
+    """Test successful authentication"""
+    mock_user = MagicMock(spec=User)
+    mock_user.check_password.return_value = True
+    monkeypatch.setattr(UserService, 'get_user_by_email', lambda *_: mock_user)
 
-            with pytest.raises(ValueError, match="Email already registered"):
-                UserService.create_user("existing@example.com", "password")
+    result = UserService.authenticate("test@example.com", "correct_password")
 
-    def test_create_user_invalid_email(self, app_context):
-        """Test creating user with invalid email raises error"""
-        with patch('app.services.user_service.UserService.get_user_by_email', return_value=None):
-            with pytest.raises(ValueError, match="Invalid email format"):
-                UserService.create_user("invalid-email", "password")
+    assert result == mock_user
+    assert mock_user.check_password.call_args == call("correct_password")
 
-    def test_create_user_short_password(self, app_context):
-        """Test creating user with short password raises error"""
-        with patch('app.services.user_service.UserService.get_user_by_email', return_value=None):
-            with pytest.raises(ValueError, match="Password must be at least 6 characters"):
-                UserService.create_user("test@example.com", "12345")
 
-    def test_get_user_by_id_found(self, app_context):
-        """Test retrieving existing user by ID"""
-        with patch('app.services.user_service.db.session') as mock_session:
-            mock_user = MagicMock(spec=User)
-            mock_user.id = 1
-            mock_user.email = "test@example.com"
-            mock_session.get.return_value = mock_user
+def test_authenticate_wrong_password(monkeypatch):
+    """Test authentication with wrong password"""
+    monkeypatch.setattr(UserService, 'get_user_by_email', lambda *_: _user_false)
 
-            result = UserService.get_user_by_id(1)
+    result = UserService.authenticate("test@example.com", "wrong_password")
 
-            assert result == mock_user
-            mock_session.get.assert_called_once_with(User, 1)
+    assert result is None
 
-    def test_get_user_by_id_not_found(self, app_context):
-        """Test retrieving non-existent user returns None"""
-        with patch('app.services.user_service.db.session') as mock_session:
-            mock_session.get.return_value = None
 
-            result = UserService.get_user_by_id(999)
+def test_authenticate_user_not_found(monkeypatch):
+    """Test authentication with non-existent user"""
+    monkeypatch.setattr(UserService, 'get_user_by_email', lambda *_: None)
 
-            assert result is None
+    result = UserService.authenticate("nonexistent@example.com", "password")
 
-    def test_get_user_by_email_found(self, app_context):
-        """Test retrieving user by email"""
-        with patch('app.models.User.query') as mock_query:
-            mock_user = MagicMock(spec=User)
-            mock_user.email = "test@example.com"
+    assert result is None
 
-            mock_filter = MagicMock()
-            mock_query.filter_by.return_value = mock_filter
-            mock_filter.first.return_value = mock_user
 
-            result = UserService.get_user_by_email("test@example.com")
+def test_update_password_success(mock_db_session, monkeypatch):
+    """Test successful password update"""
+    mock_user = MagicMock(spec=User)
+    mock_user.check_password.return_value = True
+    monkeypatch.setattr(UserService, 'get_user_by_id', lambda *_: mock_user)
 
-            assert result == mock_user
-            mock_query.filter_by.assert_called_once_with(email="test@example.com")
+    result = UserService.update_password(1, "old_pass", "new_password123")
 
-    def test_get_user_by_email_not_found(self, app_context):
-        """Test retrieving non-existent email returns None"""
-        with patch('app.models.User.query') as mock_query:
-            mock_filter = MagicMock()
-            mock_query.filter_by.return_value = mock_filter
-            mock_filter.first.return_value = None
-
-            result = UserService.get_user_by_email("nonexistent@example.com")
+    assert result is True
+    assert mock_user.set_password.call_args == call("new_password123")
+    assert mock_db_session.commit.call_count == 1
 
-            assert result is None
-
-    def test_authenticate_success(self, app_context):
-        """Test successful authentication"""
-        with patch('app.services.user_service.UserService.get_user_by_email') as mock_get:
-            mock_user = MagicMock(spec=User)
-            mock_user.check_password.return_value = True
-            mock_get.return_value = mock_user
 
-            result = UserService.authenticate("test@example.com", "correct_password")
+@pytest.mark.parametrize("user_id,get_return,old,new,msg", [
+    (999, None, "old_pass", "new_pass", _RE_USER_NOT_FOUND),
+    (1, _user_false, "wrong_old", "new_pass", _RE_WRONG_OLD_PASSWORD),
+    (1, _user_true, "old_pass", "short", _RE_SHORT_NEW_PASSWORD),
+])
+def test_update_password_rejects(monkeypatch, user_id, get_return,
+                                 old, new, msg):
+    """Test update_password rejects missing users, wrong old and short new passwords"""
+    monkeypatch.setattr(UserService, 'get_user_by_id', lambda *_: get_return)
+    with pytest.raises(ValueError, match=msg):
+        UserService.update_password(user_id, old, new)
 
-            assert result == mock_user
-            mock_user.check_password.assert_called_once_with("correct_password")
 
-    def test_authenticate_wrong_password(self, app_context):
-        """Test authentication with wrong password"""
-        with patch('app.services.user_service.UserService.get_user_by_email') as mock_get:
-            mock_user = MagicMock(spec=User)
-            mock_user.check_password.return_value = False
-            mock_get.return_value = mock_user
-
-            result = UserService.authenticate("test@example.com", "wrong_password")
+def test_delete_user_success(mock_db_session, monkeypatch):
+    """Test successful user deletion"""
+    mock_user = SimpleNamespace()
+    monkeypatch.setattr(UserService, 'get_user_by_id', lambda *_: mock_user)
 
-            assert result is None
-
-    def test_authenticate_user_not_found(self, app_context):
-        """Test authentication with non-existent user"""
-        with patch('app.services.user_service.UserService.get_user_by_email', return_value=None):
-            result = UserService.authenticate("nonexistent@example.com", "password")
-
-            assert result is None
-
-    def test_update_password_success(self, app_context):
-        """Test successful password update"""
-        with patch('app.services.user_service.db.session') as mock_session, \
-             patch('app.services.user_service.UserService.get_user_by_id') as mock_get:
-
-            mock_user = MagicMock(spec=User)
-            mock_user.check_password.return_value = True
-            mock_get.return_value = mock_user
-
-            result = UserService.update_password(1, "old_pass", "new_password123")
-
-            assert result is True
-            mock_user.set_password.assert_called_once_with("new_password123")
-            assert mock_session.commit.called
+    result = UserService.delete_user(1)
 
-    def test_update_password_user_not_found(self, app_context):
-        """Test updating password for non-existent user"""
-        with patch('app.services.user_service.UserService.get_user_by_id', return_value=None):
-            with pytest.raises(ValueError, match="User not found"):
-                UserService.update_password(999, "old_pass", "new_pass")
+    assert result is True
+    assert mock_db_session.delete.call_count == 1
+    assert mock_db_session.delete.call_args == call(mock_user)
+    assert mock_db_session.commit.call_count == 1
 
-    def test_update_password_wrong_old_password(self, app_context):
-        """Test updating password with incorrect old password"""
-        with patch('app.services.user_service.UserService.get_user_by_id') as mock_get:
-            mock_user = MagicMock(spec=User)
-            mock_user.check_password.return_value = False
-            mock_get.return_value = mock_user
 
-            with pytest.raises(ValueError, match="Current password is incorrect"):
-                UserService.update_password(1, "wrong_old", "new_pass")
+def test_delete_user_not_found(monkeypatch):
+    """Test deleting non-existent user"""
+    monkeypatch.setattr(UserService, 'get_user_by_id', lambda *_: None)
+    with pytest.raises(ValueError, match=_RE_USER_NOT_FOUND):
+        UserService.delete_user(999)
 
-    def test_update_password_invalid_new_password(self, app_context):
-        """Test updating with invalid new password"""
-        with patch('app.services.user_service.UserService.get_user_by_id') as mock_get:
-            mock_user = MagicMock(spec=User)
-            mock_user.check_password.return_value = True
-            mock_get.return_value = mock_user
 
-            with pytest.raises(ValueError, match="New password must be at least 6 characters"):
-                UserService.update_password(1, "old_pass", "short")
+def test_get_note_count(mock_db_session):
+    """Test note counting issues a scalar COUNT instead of loading rows"""
+    mock_db_session.scalar.return_value = 3
 
-    def test_delete_user_success(self, app_context):
-        """Test successful user deletion"""
-        with patch('app.services.user_service.db.session') as mock_session, \
-             patch('app.services.user_service.UserService.get_user_by_id') as mock_get:
+    result = UserService.get_note_count(1)
 
-            mock_user = MagicMock(spec=User)
-            mock_get.return_value = mock_user
+    assert result == 3
+    assert mock_db_session.scalar.call_count == 1
 
-            result = UserService.delete_user(1)
 
-            assert result is True
-            mock_session.delete.assert_called_once_with(mock_user)
-            assert mock_session.commit.called
+def test_get_all_users(user_query_mock):
+    """Test retrieving all users"""
+    mock_user1 = SimpleNamespace()
+    mock_user2 = SimpleNamespace()
+    user_query_mock.options.return_value.order_by.return_value.all.return_value = [
+        mock_user1, mock_user2]
 
-    def test_delete_user_not_found(self, app_context):
-        """Test deleting non-existent user"""
-        with patch('app.services.user_service.UserService.get_user_by_id', return_value=None):
-            with pytest.raises(ValueError, match="User not found"):
-                UserService.delete_user(999)
-
-    def test_get_all_users(self, app_context):
-        """Test retrieving all users"""
-        with patch('app.models.User.query') as mock_query:
-            mock_user1 = MagicMock(spec=User)
-            mock_user2 = MagicMock(spec=User)
-            mock_order = MagicMock()
+    result = UserService.get_all_users()
 
-            mock_query.order_by.return_value = mock_order
-            mock_order.all.return_value = [mock_user1, mock_user2]
-
-            result = UserService.get_all_users()
-
-            assert len(result) == 2
-            assert result[0] == mock_user1
-            assert result[1] == mock_user2
+    assert len(result) == 2
+    assert result[0] == mock_user1
+    assert result[1] == mock_user2